@@ -1,41 +1,103 @@
-Sure, here's the contents for the file: /flask-photo-manager/flask-photo-manager/src/photo_manager.py
-
-from flask import current_app, request, redirect, url_for, flash
+from flask import flash
 import os
 import shutil
 
-def get_next_photo(current_photo, photo_list):
-    """Retrieve the next photo in the list."""
-    if current_photo in photo_list:
-        current_index = photo_list.index(current_photo)
-        next_index = (current_index + 1) % len(photo_list)
-        return photo_list[next_index]
-    return None
-
-def delete_photo(photo_path):
-    """Delete the specified photo."""
-    try:
-        os.remove(photo_path)
-        flash('Photo deleted successfully.', 'success')
-    except Exception as e:
-        flash(f'Error deleting photo: {e}', 'error')
-
-def rename_photo(photo_path, new_name):
-    """Rename the specified photo."""
-    try:
-        directory = os.path.dirname(photo_path)
-        new_path = os.path.join(directory, new_name)
-        os.rename(photo_path, new_path)
-        flash('Photo renamed successfully.', 'success')
-    except Exception as e:
-        flash(f'Error renaming photo: {e}', 'error')
-
-def move_photo(photo_path, new_directory):
-    """Move the specified photo to a new directory."""
-    try:
-        if not os.path.exists(new_directory):
-            os.makedirs(new_directory)
-        shutil.move(photo_path, new_directory)
-        flash('Photo moved successfully.', 'success')
-    except Exception as e:
-        flash(f'Error moving photo: {e}', 'error')
\ No newline at end of file
+class PhotoManager:
+    """Manages the photos of a directory with O(1) next-photo lookup.
+
+    The directory is scanned once, lazily, on first access. Photos are kept
+    in a dict-backed doubly-linked ring (prev/next maps), so fetching the
+    next photo is a dict lookup instead of an O(N) list.index per request,
+    and deletions/renames splice the ring in place.
+    """
+
+    def __init__(self, photo_directory):
+        self.photo_directory = photo_directory
+        self._next = None  # Built lazily by _ensure_scanned
+        self._prev = None
+        self._first = None
+
+    def _ensure_scanned(self):
+        """Scan the photo directory once and build the prev/next ring."""
+        if self._next is not None:
+            return
+        photos = sorted(
+            entry.name for entry in os.scandir(self.photo_directory)
+            if entry.is_file()
+        )
+        count = len(photos)
+        self._next = {photo: photos[(i + 1) % count] for i, photo in enumerate(photos)}
+        self._prev = {photo: photos[(i - 1) % count] for i, photo in enumerate(photos)}
+        self._first = photos[0] if photos else None
+
+    def _photo_path(self, photo):
+        return os.path.join(self.photo_directory, photo)
+
+    def _remove_from_ring(self, photo):
+        """Splice a photo out of the ring: its prev now points to its next."""
+        next_photo = self._next.pop(photo)
+        prev_photo = self._prev.pop(photo)
+        if next_photo == photo:  # Last photo in the ring
+            self._first = None
+            return
+        self._next[prev_photo] = next_photo
+        self._prev[next_photo] = prev_photo
+        if self._first == photo:
+            self._first = next_photo
+
+    def _rename_in_ring(self, photo, new_name):
+        """Replace a photo's ring node in place, keeping its neighbours."""
+        next_photo = self._next.pop(photo)
+        prev_photo = self._prev.pop(photo)
+        if next_photo == photo:  # Only photo in the ring
+            self._next[new_name] = new_name
+            self._prev[new_name] = new_name
+        else:
+            self._next[new_name] = next_photo
+            self._prev[new_name] = prev_photo
+            self._next[prev_photo] = new_name
+            self._prev[next_photo] = new_name
+        if self._first == photo:
+            self._first = new_name
+
+    def get_next_photo(self, current_photo=None):
+        """Retrieve the next photo in the ring, or the first one."""
+        self._ensure_scanned()
+        if current_photo is None:
+            return self._first
+        return self._next.get(current_photo)
+
+    def delete_photo(self, photo):
+        """Delete the specified photo."""
+        self._ensure_scanned()
+        try:
+            os.remove(self._photo_path(photo))
+            if photo in self._next:
+                self._remove_from_ring(photo)
+            flash('Photo deleted successfully.', 'success')
+        except Exception as e:
+            flash(f'Error deleting photo: {e}', 'error')
+
+    def rename_photo(self, photo, new_name):
+        """Rename the specified photo."""
+        self._ensure_scanned()
+        try:
+            os.rename(self._photo_path(photo), self._photo_path(new_name))
+            if photo in self._next:
+                self._rename_in_ring(photo, new_name)
+            flash('Photo renamed successfully.', 'success')
+        except Exception as e:
+            flash(f'Error renaming photo: {e}', 'error')
+
+    def move_photo(self, photo, new_directory):
+        """Move the specified photo to a new directory."""
+        self._ensure_scanned()
+        try:
+            if not os.path.exists(new_directory):
+                os.makedirs(new_directory)
+            shutil.move(self._photo_path(photo), new_directory)
+            if photo in self._next:
+                self._remove_from_ring(photo)
+            flash('Photo moved successfully.', 'success')
+        except Exception as e:
+            flash(f'Error moving photo: {e}', 'error')
@@ -1,18 +1,35 @@
+import atexit
+import errno
 import os
 import shutil
 import hashlib
+import mmap
 import re
 import subprocess
 import argparse
 import json
+import multiprocessing
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
 from datetime import datetime
 from collections import OrderedDict
+from functools import lru_cache
 
-TMP_DIR = "/tmp/sortphotos"  # Temporary directory for JSON files
+try:
+    import blake3  # Optional: much faster than SHA-256 on large photos/videos
+except ImportError:
+    blake3 = None
 
-# Ensure TMP_DIR exists
-if not os.path.exists(TMP_DIR):
-    os.makedirs(TMP_DIR, exist_ok=True)
+try:
+    import orjson  # Optional: C JSON parser, ~3-5x faster than stdlib
+except ImportError:
+    orjson = None
+
+try:
+    import re2  # Optional: google-re2 DFA engine, linear-time scanning
+except ImportError:
+    re2 = None
 
 DATE_FORMATS = [
     "%Y:%m:%d %H:%M:%S",          # Standard EXIF format
@@ -30,83 +47,336 @@ DATE_FORMATS = [
     "%Y-%m-%dT%H:%M:%S",          # ISO format with 'T' separator
 ]
 
-def get_md5(file_path):
-    """Compute the MD5 checksum of a file."""
-    hash_md5 = hashlib.md5()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
+def parse_exif_date(value):
+    """Parse a date string, dispatching on its shape before falling back to the format list."""
+    value = value.strip()
+
+    # EXIF "YYYY:MM:DD HH:MM:SS", optionally with timezone suffix
+    if len(value) >= 19 and value[4] == ":" and value[7] == ":" and value[10] == " ":
+        try:
+            if len(value) == 19:
+                return datetime.strptime(value, "%Y:%m:%d %H:%M:%S")
+            return datetime.strptime(value, "%Y:%m:%d %H:%M:%S%z")
+        except ValueError:
+            pass
+
+    # ISO-like "YYYY-MM-DD[ T]HH:MM:SS[+tz]" and "YYYY-MM-DD"
+    if len(value) >= 10 and value[4] == "-" and value[7] == "-":
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+
+    # Slash-separated "YYYY/MM/DD", optionally with time and timezone
+    if len(value) >= 10 and value[4] == "/" and value[7] == "/":
+        try:
+            if len(value) == 10:
+                return datetime.strptime(value, "%Y/%m/%d")
+            if len(value) == 19:
+                return datetime.strptime(value, "%Y/%m/%d %H:%M:%S")
+            return datetime.strptime(value, "%Y/%m/%d %H:%M:%S%z")
+        except ValueError:
+            pass
+
+    # Day-first "DD-MM-YYYY" / "DD/MM/YYYY", optionally with time
+    if len(value) >= 10 and value[2] in "-/" and value[5] == value[2]:
+        separator = value[2]
+        try:
+            if len(value) == 10:
+                return datetime.strptime(value, f"%d{separator}%m{separator}%Y")
+            return datetime.strptime(value, f"%d{separator}%m{separator}%Y %H:%M:%S")
+        except ValueError:
+            pass
+
+    # Oddball formats: fall back to the full trial loop
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    return None
+
+# Cache of content fingerprints keyed by (device, inode, mtime) so repeated
+# collisions against the same target file don't re-read it from disk.
+_fingerprint_cache = {}
+
+# Per-process cache of destination directory listings so collision probing
+# works against an in-memory set instead of one exists() syscall per candidate.
+_dir_cache = {}
 
-def extract_exif_metadata(folder_path, ignored_tags, ignored_groups):
-    """Extract EXIF metadata for all files in a subfolder and store it in a JSON file."""
+# Target directories already created this run; files sharing a date bucket
+# would otherwise trigger a redundant makedirs (stat + mkdir) each.
+_ensured_dirs = set()
+
+# Device number per directory, so moves can decide rename-vs-copy once per
+# source/target folder pair instead of attempting a doomed rename per file.
+_dir_devices = {}
+
+def _dir_device(directory):
+    device = _dir_devices.get(directory)
+    if device is None:
+        device = os.stat(directory).st_dev
+        _dir_devices[directory] = device
+    return device
+
+def _stat_folder(folder_path):
+    """Stat every regular file of a folder in one scandir pass, keyed by name."""
+    stats = {}
+    try:
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        stats[entry.name] = entry.stat()
+                except OSError:
+                    continue  # Entry vanished or is unreadable; treat as missing
+    except OSError as e:
+        print(f"Warning: Could not scan {folder_path}: {e}")
+    return stats
+
+def _iter_folders(source_dir):
+    """Yield (folder, [file names]) pairs recursively using os.scandir.
+
+    DirEntry.is_file/is_dir reuse the type information from the directory
+    read itself, avoiding the extra stat per entry that os.walk plus
+    os.path.isfile incurred. 'venv' directories are skipped like before.
+    """
+    pending = [source_dir]
+    while pending:
+        folder = pending.pop()
+        files = []
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name == "venv":
+                            print(f"Skipping 'venv' directory in {folder}")
+                        else:
+                            pending.append(entry.path)
+                    elif entry.is_file():
+                        files.append(entry.name)
+        except OSError as e:
+            print(f"Warning: Could not scan {folder}: {e}")
+            continue
+        yield folder, files
+
+def _dir_listing(directory):
+    """Return (and cache) {name: stat} for the entries already in a directory."""
+    listing = _dir_cache.get(directory)
+    if listing is None:
+        listing = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    listing[entry.name] = entry.stat()
+                except OSError:
+                    continue  # Entry vanished between readdir and stat
+        _dir_cache[directory] = listing
+    return listing
+
+def get_fingerprint(path):
+    """Compute a content fingerprint of a file (BLAKE3 if available, else SHA-256)."""
+    st = os.stat(path)
+    cache_key = (st.st_dev, st.st_ino, st.st_mtime_ns)
+    digest = _fingerprint_cache.get(cache_key)
+    if digest is not None:
+        return digest
+
+    if blake3 is not None:
+        # BLAKE3 parallelizes internally over its tree structure, so let it
+        # pick its own thread count for large files.
+        hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+        if hasattr(hasher, "update_mmap"):
+            hasher.update_mmap(path)
+        elif st.st_size:
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    hasher.update(mm)
+        digest = hasher.hexdigest()
+    else:
+        with open(path, "rb") as f:
+            if hasattr(hashlib, "file_digest"):
+                # Python 3.11+: hands the whole file to OpenSSL's
+                # hardware-accelerated SHA-256 without a Python-level read loop.
+                digest = hashlib.file_digest(f, "sha256").hexdigest()
+            else:
+                hasher = hashlib.sha256()
+                if st.st_size >= 64 * 1024:
+                    # One mmap-backed update instead of a chunk loop
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        hasher.update(mm)
+                else:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        hasher.update(chunk)
+                digest = hasher.hexdigest()
+
+    _fingerprint_cache[cache_key] = digest
+    return digest
+
+def _copy_and_hash(src, dst):
+    """Copy src to dst in one pass, fingerprinting the bytes as they stream."""
+    hasher = blake3.blake3() if blake3 is not None else hashlib.sha256()
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        while True:
+            buffer = fsrc.read(1 << 20)
+            if not buffer:
+                break
+            hasher.update(buffer)
+            fdst.write(buffer)
+    shutil.copystat(src, dst)
+
+    digest = hasher.hexdigest()
+    st = os.stat(dst)
+    _fingerprint_cache[(st.st_dev, st.st_ino, st.st_mtime_ns)] = digest
+    return digest
+
+class ExifToolDaemon:
+    """Long-lived exiftool process reused across folders via the -stay_open protocol.
+
+    Spawning exiftool per folder pays perl interpreter warmup every time;
+    a single daemon fed argument blocks over stdin avoids that entirely.
+    """
+    def __init__(self):
+        # Binary pipes: the JSON payload goes straight to the parser
+        # without an intermediate UTF-8 decode of multi-MB output.
+        self._process = subprocess.Popen(
+            ["exiftool", "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        )
+        self._sequence = 0
+
+    def execute(self, args):
+        """Run one exiftool command and return its stdout as bytes."""
+        # Numbered -execute sentinels correlate each reply with its command,
+        # so a stray earlier {ready} can't truncate the wrong response.
+        self._sequence += 1
+        sentinel = f"{{ready{self._sequence}}}".encode()
+        self._process.stdin.write(("\n".join(args) + f"\n-execute{self._sequence}\n").encode())
+        self._process.stdin.flush()
+
+        output_lines = []
+        while True:
+            line = self._process.stdout.readline()
+            if not line or line.strip() == sentinel:
+                break
+            output_lines.append(line)
+        return b"".join(output_lines)
+
+    def close(self):
+        """Ask the daemon to exit and wait for it."""
+        if self._process.poll() is None:
+            try:
+                self._process.stdin.write(b"-stay_open\nFalse\n")
+                self._process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass
+            self._process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+_exiftool_daemon = None
+
+def _exiftool():
+    """Return this process's shared ExifToolDaemon, starting it on first use."""
+    global _exiftool_daemon
+    if _exiftool_daemon is None or _exiftool_daemon._process.poll() is not None:
+        if _exiftool_daemon is None:
+            atexit.register(_shutdown_exiftool)
+        _exiftool_daemon = ExifToolDaemon()
+    return _exiftool_daemon
+
+def _shutdown_exiftool():
+    """atexit hook: tell the daemon to exit instead of leaving an orphan."""
+    if _exiftool_daemon is not None:
+        _exiftool_daemon.close()
+
+# Tag names whose values are date candidates — matches the tag whitelist
+# requested from exiftool below.
+_DATE_TAG_NAMES = frozenset({
+    "CreateDate", "DateTimeOriginal", "ModifyDate", "FileModifyDate",
+    "MediaCreateDate", "GPSDateTime",
+})
+
+def extract_exif_metadata(folder_path, ignored_tags, ignored_groups, recursive=False, allowed_extensions=None):
+    """Extract EXIF metadata for files under a folder and return it as a dict."""
     metadata = {}
-    json_path = os.path.join(TMP_DIR, f"exif_metadata_{os.path.basename(folder_path)}.json")
 
-    # Run ExifTool for all files at once
-    exiftool_cmd = ["exiftool", "-json", "-time:all", "-s", "-G", "-ImageWidth", "-ImageHeight", "-Duration", "-VideoStreamType", folder_path]
-    result = subprocess.run(exiftool_cmd, capture_output=True, text=True)
+    # Set membership instead of a list scan per key
+    ignored_tags = set(ignored_tags or ())
+    ignored_groups = set(ignored_groups or ())
+
+    # Run ExifTool for all files at once, through the shared daemon.
+    # Only the tags actually consumed are requested (instead of -time:all),
+    # and -fast2 stops exiftool after the metadata block of large files.
+    # -d forces every date tag into one ISO shape, so parsing downstream is
+    # a single fromisoformat instead of a format cascade
+    exiftool_args = [
+        "-json", "-fast2", "-s", "-G",
+        "-d", "%Y-%m-%dT%H:%M:%S",
+        "-CreateDate", "-DateTimeOriginal", "-ModifyDate", "-FileModifyDate",
+        "-MediaCreateDate", "-GPSDateTime",
+        "-ImageWidth", "-ImageHeight", "-Duration", "-VideoStreamType",
+    ]
+    if recursive:
+        exiftool_args.append("-r")
+    if allowed_extensions:
+        for ext in allowed_extensions:
+            exiftool_args.extend(["-ext", ext.lstrip(".")])
+    exiftool_args.append(folder_path)
+    stdout = _exiftool().execute(exiftool_args)
 
     try:
         # Check if the output is valid JSON
-        if not result.stdout.strip():
+        if not stdout.strip():
             raise RuntimeError(f"ExifTool returned no output for {folder_path}")
-        
-        json_data = json.loads(result.stdout)
+
+        json_data = orjson.loads(stdout) if orjson is not None else json.loads(stdout)
         for file_data in json_data:
             file_path = file_data.get("SourceFile")
-            dates = []
+            oldest_date = None  # Running minimum, tracked inline
             image_width = None
             image_height = None
             duration = None
             video_stream_type = None
 
-            # Extract date information and other attributes
+            # Extract date information and other attributes, dispatching on
+            # the bare tag name instead of substring-testing every key
             for key, value in file_data.items():
-                #print(f"Processing {key}: {value}")
-                # Ignore specified tags and groups
-                if isinstance(value, str) and key.strip() not in ignored_tags:
-                    group, tag = key.split(" ", 1) if " " in key else ("", key)
-                    if group.strip() not in ignored_groups:
-                        try:
-                            # Attempt to parse the date value using multiple formats
-                            for date_format in DATE_FORMATS:
-                                try:
-                                    parsed_date = datetime.strptime(value.strip(), date_format)
-                                    # Normalize to offset-naive by removing timezone
-                                    if parsed_date.tzinfo is not None:
-                                        parsed_date = parsed_date.replace(tzinfo=None)
-                                    dates.append(parsed_date)
-                                    break  # Stop trying other formats once successful
-                                except ValueError:
-                                    continue  # Try the next format
-                        except ValueError:
-                            print(f"Warning: Invalid date format for {file_path}: {value}")
-                            continue  # Skip invalid formats
-
-                # Dynamically find and store specific attributes
-                if "ImageWidth" in key:
+                group, tag = key.split(" ", 1) if " " in key else ("", key)
+                tag_name = tag.rsplit(":", 1)[-1].strip()
+
+                if tag_name in _DATE_TAG_NAMES:
+                    # Ignore specified tags and groups
+                    if isinstance(value, str) and key.strip() not in ignored_tags and group.strip() not in ignored_groups:
+                        parsed_date = parse_exif_date(value)
+                        if parsed_date is not None:
+                            # Normalize to offset-naive by removing timezone
+                            if parsed_date.tzinfo is not None:
+                                parsed_date = parsed_date.replace(tzinfo=None)
+                            if oldest_date is None or parsed_date < oldest_date:
+                                oldest_date = parsed_date
+                elif tag_name == "ImageWidth":
                     image_width = value
-                elif "ImageHeight" in key:
+                elif tag_name == "ImageHeight":
                     image_height = value
-                elif "Duration" in key:
+                elif tag_name == "Duration":
                     duration = value
-                elif "VideoStreamType" in key:
+                elif tag_name == "VideoStreamType":
                     video_stream_type = value
-            
+
             # Store the metadata
             metadata[file_path] = {
-                "Date": min(dates).isoformat() if dates else None,
+                "Date": oldest_date,
                 "Image Width": image_width,
                 "Image Height": image_height,
                 "Duration": duration,
                 "Video Stream Type": video_stream_type
             }
 
-        # Save metadata to a JSON file for fast lookup
-        with open(json_path, "w") as json_file:
-            json.dump(metadata, json_file, default=str)
-
     except json.JSONDecodeError as e:
         print(f"Error: Failed to parse JSON output from ExifTool for {folder_path}: {e}")
         return None
@@ -114,42 +384,30 @@ def extract_exif_metadata(folder_path, ignored_tags, ignored_groups):
         print(e)
         return None
 
-    return json_path
-
-def get_exif_date(file_path, json_path):
-    """Retrieve EXIF date from the cached JSON file and return it as a datetime object."""
-    with open(json_path, "r") as json_file:
-        metadata = json.load(json_file)
+    return metadata
 
+def get_exif_date(file_path, metadata):
+    """Retrieve EXIF date from the cached metadata and return it as a datetime object."""
     # Retrieve the metadata for the specific file
     exif_data = metadata.get(file_path, {})
-    
+
     # Ensure exif_data is a dictionary
     if not isinstance(exif_data, dict):
         print(f"Warning: Invalid metadata for {file_path}. Skipping EXIF date retrieval.")
         return None
 
-    # Extract the 'Date' field
-    date_str = exif_data.get("Date")
-    if date_str:
-        for date_format in DATE_FORMATS:
-            try:
-                # Attempt to parse the date string with the current format
-                return datetime.strptime(date_str.strip(), date_format)
-            except ValueError:
-                continue  # Try the next format
-
-        # If no format matches, print an error and return None
-        print(f"Error parsing EXIF date for {file_path}: {date_str}")
-        # print(exif_data)
-    else:
+    # The 'Date' field is kept as a datetime now that the metadata never
+    # round-trips through JSON
+    file_date = exif_data.get("Date")
+    if file_date is None:
         print(f"Warning: No EXIF date found for {file_path}")
-    return None
+    return file_date
 
-def extract_date_from_filename(filename):
-    """Attempts to extract a date from filename using an ordered map of patterns and multiple formats."""
-    # Define common separators and base patterns
-    separators = ["-", "_", r"\.", ""]  # Includes -, _, ., and no separator
+def _build_filename_date_patterns():
+    """Build the ordered (compiled pattern, formats) list used by extract_date_from_filename."""
+    # Common separators as (regex form, literal form) pairs: the pattern
+    # needs the dot escaped but the strptime format needs it plain
+    separators = [("-", "-"), ("_", "_"), (r"\.", "."), ("", "")]
     base_patterns = {
         r"(\d{4}{sep}\d{2}{sep}\d{2})": ["%Y{sep}%m{sep}%d"],  # YYYY-MM-DD, YYYY.MM.DD, YYYY_MM_DD
         r"(\d{2}{sep}\d{2}{sep}\d{4})": ["%d{sep}%m{sep}%Y"],  # DD-MM-YYYY, DD.MM.YYYY, DD_MM_YYYY
@@ -167,72 +425,176 @@ def extract_date_from_filename(filename):
 
     # Dynamically generate patterns for base patterns with separators
     for base_pattern, formats in reversed(base_patterns.items()):
-        for sep in separators:
-            pattern = base_pattern.replace("{sep}", sep)
+        for regex_sep, literal_sep in separators:
+            pattern = base_pattern.replace("{sep}", regex_sep)
             base_formats = []
             for base_format in formats:
-                format = base_format.replace("{sep}", sep)
+                format = base_format.replace("{sep}", literal_sep)
                 base_formats.append(format)
             pattern_format_map[pattern] = base_formats
 
-    # Try to match each pattern and parse the date
-    for pattern, date_formats in reversed(pattern_format_map.items()):
-        match = re.search(pattern, filename, re.IGNORECASE)
-        # print(f"Trying pattern: {pattern} in {filename}")
-        # print(f"Match: {match}")
-        # print(f"Date formats: {date_formats}")
-        # If a match is found, extract the date components
-        # and try to parse them with the corresponding formats
-        if match:
-            for date_format in date_formats:
-                # print(f"Trying date format: {date_format}")
-                # Extract the matched groups and join them with the appropriate separator
-                try:
-                    # Join groups with appropriate separators if needed
-                    date_string = match.group(0)
-                    parsed_date = datetime.strptime(date_string, date_format)
-                    # print(f"Parsed date: {parsed_date}")
-                    # Validate the date (must be greater than 1950 or less than today)
-                    today = datetime.now()
-                    if parsed_date.year > 1950 and parsed_date < today:
-                        return parsed_date
-                except ValueError as e:
-                    #print(f"Error parsing date with format {date_format}: {e}")
-                    continue  # Try the next format for this pattern
+    # Compile once, in the final (reversed) trial order
+    return [
+        (re.compile(pattern, re.IGNORECASE), date_formats)
+        for pattern, date_formats in reversed(pattern_format_map.items())
+    ]
+
+# Compiled once at import time: rebuilding and re-compiling these per
+# filename cost ~20 regex compilations per processed file.
+_FILENAME_DATE_PATTERNS = _build_filename_date_patterns()
+
+_DIGIT_QUANTIFIER = re.compile(r"\\d\{(\d+)\}")
+
+def _pattern_digit_count(source):
+    """Number of digits a pattern requires — a proxy for its specificity."""
+    quantified = sum(int(n) for n in _DIGIT_QUANTIFIER.findall(source))
+    return quantified + len(re.findall(r"\\d(?!\{)", source))
+
+def _build_combined_date_pattern():
+    """Union of all filename-date patterns in one alternation, most digits first."""
+    sources = []
+    seen = set()
+    ordered = sorted(
+        _FILENAME_DATE_PATTERNS,
+        key=lambda item: -_pattern_digit_count(item[0].pattern),
+    )
+    for pattern, _ in ordered:
+        if pattern.pattern not in seen:
+            seen.add(pattern.pattern)
+            sources.append(f"(?:{pattern.pattern})")
+    combined = "|".join(sources)
+
+    # Prefer the re2 DFA when installed: one linear pass per filename with
+    # no backtracking. Fall back to stdlib re otherwise.
+    if re2 is not None:
+        try:
+            return re2.compile(combined, re.IGNORECASE)
+        except re2.error:
+            pass
+    return re.compile(combined, re.IGNORECASE)
+
+_COMBINED_DATE_PATTERN = _build_combined_date_pattern()
+
+@lru_cache(maxsize=4096)
+def _formats_for_candidate(date_string):
+    """Formats of every pattern fully matching this candidate, in trial order."""
+    formats = []
+    for pattern, date_formats in _FILENAME_DATE_PATTERNS:
+        if pattern.fullmatch(date_string):
+            formats.extend(date_formats)
+    return tuple(OrderedDict.fromkeys(formats))
+
+_EMBEDDED_YEAR = re.compile(r"\d{4}")
+
+def _parse_candidate(date_string, today):
+    """Try every format matching a candidate; return the first valid date."""
+    for date_format in _formats_for_candidate(date_string):
+        try:
+            parsed_date = datetime.strptime(date_string, date_format)
+        except ValueError:
+            continue  # Try the next format for this candidate
+        # Validate the date (must be greater than 1950 or less than today)
+        if parsed_date.year > 1950 and parsed_date < today:
+            return parsed_date
+    return None
+
+def extract_date_from_filename(filename):
+    """Attempts to extract a date from filename using one combined pattern scan."""
+    today = datetime.now()
+
+    # One scan over the filename finds every date-like candidate. Candidates
+    # are tried most digits first regardless of position — matching the old
+    # per-pattern order — so a leading bare year ("2019_trip_20200315") can't
+    # shadow a full date later in the name. The format dispatch runs on the
+    # short matched text and is memoized, since the same date string recurs
+    # across a burst of photos.
+    candidates = [match.group(0) for match in _COMBINED_DATE_PATTERN.finditer(filename)]
+    candidates.sort(key=lambda candidate: -sum(c.isdigit() for c in candidate))
+    for date_string in candidates:
+        parsed_date = _parse_candidate(date_string, today)
+        if parsed_date is not None:
+            return parsed_date
+
+    # A candidate that defeated all of its formats (e.g. "2014 Jan" with no
+    # day) still consumed the text it covers, so the bare-year pattern never
+    # saw it; recover the year-level date the old per-pattern search found.
+    for date_string in candidates:
+        for year in _EMBEDDED_YEAR.findall(date_string):
+            parsed_date = _parse_candidate(year, today)
+            if parsed_date is not None:
+                return parsed_date
 
     return None
 
-def get_unique_filename(target_dir, filename, file_path):
-    """Ensures uniqueness: same name with different MD5 gets suffixed."""
+class _SanitizeTable(dict):
+    """Translation table mapping every character outside [a-zA-Z0-9_.-] to '_'."""
+    def __missing__(self, codepoint):
+        return "_"
+
+# str.translate runs in C, so sanitizing is one pass instead of a regex scan
+_SANITIZE_TABLE = _SanitizeTable(
+    {ord(c): c for c in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_.-"}
+)
+_COLLAPSE_UNDERSCORES = re.compile(r"_{2,}")
+
+def get_unique_filename(target_dir, filename, file_path, src_size=None):
+    """Ensures uniqueness: same name with different content gets suffixed."""
     base_name, ext = os.path.splitext(filename)
     counter = 1
 
-    md5_hash = get_md5(file_path)
+    src_stat = os.stat(file_path)
+    if src_size is None:
+        src_size = src_stat.st_size
+    src_fingerprint = None  # Computed lazily, only when a same-size collision occurs
+
+    listing = _dir_listing(target_dir)
 
     while True:
         target_path = os.path.join(target_dir, filename)
-        if not os.path.exists(target_path):
-            return target_path  # File doesn't exist, safe to move
-        
-        existing_md5 = get_md5(target_path)
-        if existing_md5 == md5_hash:
-            print(f"Skipping {filename}: Identical MD5 already exists.")
-            
+        # The cached listing answers taken-name probes; a miss is confirmed
+        # on disk in case another worker landed a file here after the
+        # listing was read.
+        target_stat = listing.get(filename)
+        if target_stat is None:
+            try:
+                target_stat = os.stat(target_path)
+            except FileNotFoundError:
+                listing[filename] = src_stat  # Reserve the name within this run
+                return target_path  # File doesn't exist, safe to move
+            listing[filename] = target_stat  # Refresh the stale listing entry
+
+        if (target_stat.st_dev, target_stat.st_ino) == (src_stat.st_dev, src_stat.st_ino):
+            # A hard link to the source: identical content, no read needed
+            is_duplicate = True
+        elif target_stat.st_size == src_size:
+            # Same size: only now is hashing worth it
+            if src_fingerprint is None:
+                src_fingerprint = get_fingerprint(file_path)
+            is_duplicate = get_fingerprint(target_path) == src_fingerprint
+        else:
+            # Different sizes cannot be duplicates
+            is_duplicate = False
+
+        if is_duplicate:
+            print(f"Skipping {filename}: Identical content already exists.")
+
             # Remove the source file since it's a duplicate
             print(f"Removing source file: {file_path}")
 
             os.remove(file_path)
             print(f"Removed source file: {file_path}")
- 
+
             return None  # File already exists, identical content
 
         filename = f"{base_name}_{counter}{ext}"
         counter += 1
 
-def move_or_copy_file(file_path, target_dir, file_date, json_path, source_dir, include_relative_path=False, copy=False):
+def move_or_copy_file(file_path, target_dir, file_date, metadata, source_dir, include_relative_path=False, copy=False, src_size=None, lock=None):
     """Moves or copies file to correct 'year-month-day' directory, prefixing date, dimensions, duration, codec, or relative path to filename."""
-    os.makedirs(target_dir, exist_ok=True)
-    
+    if target_dir not in _ensured_dirs:
+        os.makedirs(target_dir, exist_ok=True)
+        _ensured_dirs.add(target_dir)
+
     original_filename = os.path.basename(file_path)
     date_prefix = file_date.strftime("%Y-%m-%d")
 
@@ -242,102 +604,182 @@ def move_or_copy_file(file_path, target_dir, file_date, json_path, source_dir, i
         print(f"Error: File {file_path} has a future date ({date_prefix}). Skipping.")
         return
 
-    # Extract metadata from EXIF JSON
-    metadata_info = ""
-    with open(json_path, "r") as json_file:
-        metadata = json.load(json_file)
-        exif_data = metadata.get(file_path, {})
+    # Extract metadata from the cached EXIF dict
+    exif_data = metadata.get(file_path, {})
 
-        # Ensure exif_data is a dictionary
-        if not isinstance(exif_data, dict):
-            print(f"Warning: Invalid metadata for {file_path}. Skipping file.")
-            return
+    # Ensure exif_data is a dictionary
+    if not isinstance(exif_data, dict):
+        print(f"Warning: Invalid metadata for {file_path}. Skipping file.")
+        return
+
+    # Collect the filename pieces and join them once at the end, instead of
+    # re-allocating an accumulator string per piece
+    parts = [date_prefix]
 
-        # Check if the file is an image and extract dimensions
-        image_width = exif_data.get("Image Width")
-        image_height = exif_data.get("Image Height")
-        if image_width and image_height:
-            metadata_info = f"_{image_width}x{image_height}"
+    # Check if the file is an image and extract dimensions
+    image_width = exif_data.get("Image Width")
+    image_height = exif_data.get("Image Height")
+    if image_width and image_height:
+        parts.append(f"{image_width}x{image_height}")
 
-        # Check if the file is a video and extract duration and codec
-        duration = exif_data.get("Duration")
-        codec = exif_data.get("Video Stream Type")
-        if duration:
-            metadata_info = f"{metadata_info}_{duration.replace(':', '-')}"  # Replace colons with dashes for filename safety
-        if codec:
-            metadata_info = f"{metadata_info}_{codec.replace('/', '-').replace(' ', '_')}"  # Replace slashes and spaces for filename safety
+    # Check if the file is a video and extract duration and codec
+    duration = exif_data.get("Duration")
+    codec = exif_data.get("Video Stream Type")
+    if duration:
+        parts.append(duration.replace(':', '-'))  # Replace colons with dashes for filename safety
+    if codec:
+        parts.append(codec.replace('/', '-').replace(' ', '_'))  # Replace slashes and spaces for filename safety
 
     # Include relative path in the filename if the option is enabled
-    relative_path_info = ""
     if include_relative_path:
         relative_path = os.path.relpath(os.path.dirname(file_path), source_dir)
-        relative_path_info = f"_{relative_path.replace(os.sep, '_')}"  # Replace path separators with underscores
+        parts.append(relative_path.replace(os.sep, '_'))  # Replace path separators with underscores
+
+    parts.append(original_filename)
 
     # Construct the new filename
-    new_filename = f"{date_prefix}{metadata_info}{relative_path_info}_{original_filename}"
-    new_filename = re.sub(r'[^a-zA-Z0-9_.-]', '_', new_filename)  # Sanitize filename
-    new_filename = re.sub(r'_{2,}', '_', new_filename)  # Remove duplicate underscores
+    new_filename = "_".join(parts)
+    new_filename = new_filename.translate(_SANITIZE_TABLE)  # Sanitize filename
+    new_filename = _COLLAPSE_UNDERSCORES.sub('_', new_filename)  # Remove duplicate underscores
     new_filename = new_filename[:255]  # Limit filename length to 255 characters
     new_filename = new_filename.strip('_')  # Remove trailing underscores
 
-    target_path = get_unique_filename(target_dir, new_filename, file_path)
-    if target_path:
-        if copy:
-            shutil.copy2(file_path, target_path)
-            print(f"Copied {file_path} -> {target_path}")
-        else:
-            shutil.move(file_path, target_path)
-            print(f"Moved {file_path} -> {target_path}")
+    if src_size is None:
+        src_size = os.path.getsize(file_path)
+    same_device = not copy and _dir_device(os.path.dirname(file_path)) == _dir_device(target_dir)
+
+    # The lock only covers collision resolution and claiming the chosen name;
+    # bulk byte transfer (copies and cross-device moves) streams outside it,
+    # so workers filing into the same bucket still overlap on I/O.
+    with lock if lock is not None else nullcontext():
+        target_path = get_unique_filename(target_dir, new_filename, file_path, src_size)
+        if target_path is None:
+            print(f"Skipping {file_path}: Duplicate detected.")
+            return
+        if same_device:
+            try:
+                # Same filesystem: a single atomic rename syscall
+                os.replace(file_path, target_path)
+                print(f"Moved {file_path} -> {target_path}")
+                return
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                # Matching st_dev can still cross mounts (e.g. overlayfs)
+        # Claim the name on disk before releasing the lock, so other
+        # workers' free-name probes see it while the bytes are in flight.
+        open(target_path, "wb").close()
+
+    if copy:
+        # One read pass both copies the bytes and fingerprints them, so
+        # later collisions against this target never re-read it
+        _copy_and_hash(file_path, target_path)
+        print(f"Copied {file_path} -> {target_path}")
     else:
-        print(f"Skipping {file_path}: Duplicate detected.")
+        shutil.move(file_path, target_path)  # Cross-device: copy + unlink
+        print(f"Moved {file_path} -> {target_path}")
 
-def organize_files(source_dir, destination_dir, ignored_tags, ignored_groups, allowed_extensions, copy=False, include_relative_path=False):
-    """Processes all files recursively, caching EXIF data first."""
+def process_folder(root, files, metadata, destination_dir, source_dir, allowed_extensions, copy, include_relative_path, locks):
+    """Processes one source folder using the pre-extracted metadata slice for its files."""
     moved_count = 0
     skipped_count = 0
     error_count = 0
 
-    for root, dirs, files in os.walk(source_dir):
-        # Skip 'venv' directories
-        if "venv" in dirs:
-            print(f"Skipping 'venv' directory in {root}")
-            dirs.remove("venv")  # Prevent descending into 'venv'
-        if "." in dirs:
-            print(f"Skipping '.' directory in {root}")
-            dirs.remove(".")  # Prevent descending into '.'
+    # Normalize the extensions once; membership in a frozenset is a single
+    # hash lookup per file instead of string comparisons per extension
+    ext_set = frozenset(
+        ext.lower() if ext.startswith(".") else f".{ext.lower()}"
+        for ext in allowed_extensions
+    )
 
-        json_path = extract_exif_metadata(root, ignored_tags, ignored_groups)  # Cache EXIF data per subfolder
+    folder_stats = _stat_folder(root)  # One scandir pass instead of per-file isfile/getsize syscalls
 
-        for file_name in files:
-            file_path = os.path.join(root, file_name)
+    for file_name in files:
+        file_path = os.path.join(root, file_name)
 
-            # Allow only files with specified extensions
-            if not any(file_name.lower().endswith(ext.lower()) for ext in allowed_extensions):
-                print(f"Skipping {file_name}: Not an allowed extension in {allowed_extensions}")                
-                skipped_count += 1
-                continue  # Skip files with disallowed extensions
+        # Allow only files with specified extensions
+        if os.path.splitext(file_name)[1].lower() not in ext_set:
+            print(f"Skipping {file_name}: Not an allowed extension in {allowed_extensions}")
+            skipped_count += 1
+            continue  # Skip files with disallowed extensions
 
-            if os.path.isfile(file_path):
-                try:
-                    exif_date = get_exif_date(file_path, json_path)
-                    
-                    filename_date = extract_date_from_filename(
-                        os.path.relpath(file_path, source_dir) if include_relative_path else file_name
-                    )
-
-                    # Use the oldest available date
-                    file_date = min(filter(None, [exif_date, filename_date]), default=None)
-
-                    if file_date:
-                        target_dir = os.path.join(destination_dir, f"{file_date.year}-{file_date.month:02d}-{file_date.day:02d}")
-                        move_or_copy_file(file_path, target_dir, file_date, json_path, source_dir, include_relative_path, copy)
-                        moved_count += 1
-                    else:
-                        print(f"Skipping {file_path}: No valid date found. [{exif_date}, {filename_date}]")
-                        skipped_count += 1
-                except Exception as e:
-                    print(f"Error processing {file_path}: {e}")
-                    error_count += 1
+        src_stat = folder_stats.get(file_name)
+        if src_stat is not None:
+            try:
+                exif_date = get_exif_date(file_path, metadata)
+
+                filename_date = extract_date_from_filename(
+                    os.path.relpath(file_path, source_dir) if include_relative_path else file_name
+                )
+
+                # Use the oldest available date
+                if exif_date and filename_date:
+                    file_date = min(exif_date, filename_date)
+                else:
+                    file_date = exif_date or filename_date
+
+                if file_date:
+                    target_dir = os.path.join(destination_dir, f"{file_date.year}-{file_date.month:02d}-{file_date.day:02d}")
+                    # Lock striped by target dir: only workers filing into the
+                    # same date bucket contend, and crc32 is stable across
+                    # processes where str hashing is not
+                    lock = locks[zlib.crc32(target_dir.encode()) % len(locks)]
+                    move_or_copy_file(file_path, target_dir, file_date, metadata, source_dir, include_relative_path, copy, src_stat.st_size, lock)
+                    moved_count += 1
+                else:
+                    print(f"Skipping {file_path}: No valid date found. [{exif_date}, {filename_date}]")
+                    skipped_count += 1
+            except Exception as e:
+                print(f"Error processing {file_path}: {e}")
+                error_count += 1
+
+    return moved_count, skipped_count, error_count
+
+def organize_files(source_dir, destination_dir, ignored_tags, ignored_groups, allowed_extensions, copy=False, include_relative_path=False):
+    """Processes all files recursively, dispatching independent folders to a process pool."""
+    moved_count = 0
+    skipped_count = 0
+    error_count = 0
+
+    # Normalize user-typed paths: a trailing slash on source_dir would make
+    # _iter_folders yield a top-level root that never matches the
+    # dirname-keyed metadata grouping below
+    source_dir = os.path.normpath(source_dir)
+
+    # One recursive exiftool pass over the whole tree replaces one
+    # invocation (and one JSON payload) per folder.
+    tree_metadata = extract_exif_metadata(
+        source_dir, ignored_tags, ignored_groups,
+        recursive=True, allowed_extensions=allowed_extensions,
+    ) or {}
+
+    # Group the metadata per containing folder so each worker only gets its slice
+    metadata_by_folder = {}
+    for file_path, file_metadata in tree_metadata.items():
+        metadata_by_folder.setdefault(os.path.dirname(file_path), {})[file_path] = file_metadata
+
+    folders = [(root, files) for root, files in _iter_folders(source_dir) if files]
+
+    # Folders are independent units of work: exiftool on one folder can run
+    # while another folder's files are being hashed and moved.
+    with multiprocessing.Manager() as manager:
+        # A stripe of locks keyed by target directory, so workers filing
+        # into different date buckets never serialize each other
+        locks = [manager.Lock() for _ in range(16)]
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = [
+                executor.submit(
+                    process_folder, root, files, metadata_by_folder.get(root, {}),
+                    destination_dir, source_dir, allowed_extensions,
+                    copy, include_relative_path, locks,
+                )
+                for root, files in folders
+            ]
+            for future in as_completed(futures):
+                moved, skipped, errors = future.result()
+                moved_count += moved
+                skipped_count += skipped
+                error_count += errors
 
     # Print summary statistics
     print("\nSummary:")
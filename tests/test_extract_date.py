@@ -28,6 +28,21 @@ class TestExtractDateFromFilename(unittest.TestCase):
         expected_date = datetime(2014, 5, 5)
         self.assertEqual(extract_date_from_filename(filename), expected_date)
 
+    def test_dot_separated_format(self):
+        filename = "photo.2021.03.04.jpg"
+        expected_date = datetime(2021, 3, 4)
+        self.assertEqual(extract_date_from_filename(filename), expected_date)
+
+    def test_month_name_falls_back_to_year(self):
+        filename = "holiday_2014 Jan 5.jpg"
+        expected_date = datetime(2014, 1, 1)
+        self.assertEqual(extract_date_from_filename(filename), expected_date)
+
+    def test_full_date_beats_earlier_bare_year(self):
+        filename = "2019_Summer_20200315.jpg"
+        expected_date = datetime(2020, 3, 15)
+        self.assertEqual(extract_date_from_filename(filename), expected_date)
+
     def test_no_valid_date(self):
         filename = "random_file_name.jpg"
         self.assertIsNone(extract_date_from_filename(filename))
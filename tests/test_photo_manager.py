@@ -0,0 +1,84 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "flask-photo-manager", "src"))
+
+try:
+    from photo_manager import PhotoManager
+except ImportError:  # flask is not installed
+    PhotoManager = None
+
+@unittest.skipIf(PhotoManager is None, "flask is not installed")
+class TestPhotoRing(unittest.TestCase):
+    def setUp(self):
+        """Set up a photo directory with three photos in name order."""
+        self.photo_dir = "tests/ring_photos"
+        os.makedirs(self.photo_dir, exist_ok=True)
+        for name in ("a.jpg", "b.jpg", "c.jpg"):
+            with open(os.path.join(self.photo_dir, name), "w") as f:
+                f.write(name)
+        self.manager = PhotoManager(self.photo_dir)
+
+    def tearDown(self):
+        """Clean up the photo directory."""
+        for name in os.listdir(self.photo_dir):
+            os.remove(os.path.join(self.photo_dir, name))
+        os.rmdir(self.photo_dir)
+
+    def test_first_photo(self):
+        """Without a current photo, the first photo in name order is returned."""
+        self.assertEqual(self.manager.get_next_photo(), "a.jpg")
+
+    def test_next_photo(self):
+        """The next photo follows the current one in name order."""
+        self.assertEqual(self.manager.get_next_photo("a.jpg"), "b.jpg")
+
+    def test_wrap_around(self):
+        """The last photo wraps around to the first."""
+        self.assertEqual(self.manager.get_next_photo("c.jpg"), "a.jpg")
+
+    def test_empty_directory(self):
+        """An empty directory has no first photo."""
+        empty_dir = "tests/ring_empty"
+        os.makedirs(empty_dir, exist_ok=True)
+        try:
+            self.assertIsNone(PhotoManager(empty_dir).get_next_photo())
+        finally:
+            os.rmdir(empty_dir)
+
+    def test_remove_splices_neighbours(self):
+        """Removing a photo joins its previous and next neighbours."""
+        self.manager._ensure_scanned()
+        self.manager._remove_from_ring("b.jpg")
+        self.assertEqual(self.manager.get_next_photo("a.jpg"), "c.jpg")
+        self.assertEqual(self.manager.get_next_photo("c.jpg"), "a.jpg")
+
+    def test_remove_first_photo_advances_first(self):
+        """Removing the first photo makes its successor the new first."""
+        self.manager._ensure_scanned()
+        self.manager._remove_from_ring("a.jpg")
+        self.assertEqual(self.manager.get_next_photo(), "b.jpg")
+
+    def test_remove_last_photo_empties_ring(self):
+        """Removing every photo leaves an empty ring."""
+        self.manager._ensure_scanned()
+        for name in ("a.jpg", "b.jpg", "c.jpg"):
+            self.manager._remove_from_ring(name)
+        self.assertIsNone(self.manager.get_next_photo())
+
+    def test_rename_keeps_neighbours(self):
+        """A renamed photo keeps its place between its neighbours."""
+        self.manager._ensure_scanned()
+        self.manager._rename_in_ring("b.jpg", "z.jpg")
+        self.assertEqual(self.manager.get_next_photo("a.jpg"), "z.jpg")
+        self.assertEqual(self.manager.get_next_photo("z.jpg"), "c.jpg")
+
+    def test_rename_first_photo_updates_first(self):
+        """Renaming the first photo keeps it as the entry point."""
+        self.manager._ensure_scanned()
+        self.manager._rename_in_ring("a.jpg", "z.jpg")
+        self.assertEqual(self.manager.get_next_photo(), "z.jpg")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import os
+import sortphotos
+from sortphotos import get_unique_filename
+
+class TestGetUniqueFilename(unittest.TestCase):
+    def setUp(self):
+        """Set up test directories and files."""
+        # Each test simulates a fresh run, so drop the per-run caches
+        sortphotos._dir_cache.clear()
+        sortphotos._fingerprint_cache.clear()
+
+        self.source_dir = "tests/unique_source"
+        self.target_dir = "tests/unique_target"
+        os.makedirs(self.source_dir, exist_ok=True)
+        os.makedirs(self.target_dir, exist_ok=True)
+
+        self.source_file = os.path.join(self.source_dir, "photo.jpg")
+        with open(self.source_file, "w") as f:
+            f.write("Source content")
+
+    def tearDown(self):
+        """Clean up test directories and files."""
+        for directory in (self.source_dir, self.target_dir):
+            for root, dirs, files in os.walk(directory, topdown=False):
+                for file in files:
+                    os.remove(os.path.join(root, file))
+                for dir in dirs:
+                    os.rmdir(os.path.join(root, dir))
+
+    def test_no_collision_returns_target_path(self):
+        """A name with no collision should be returned unchanged."""
+        target_path = get_unique_filename(self.target_dir, "photo.jpg", self.source_file)
+        self.assertEqual(target_path, os.path.join(self.target_dir, "photo.jpg"))
+
+    def test_identical_duplicate_removes_source(self):
+        """An identical file at the target should be detected and the source removed."""
+        with open(os.path.join(self.target_dir, "photo.jpg"), "w") as f:
+            f.write("Source content")
+
+        target_path = get_unique_filename(self.target_dir, "photo.jpg", self.source_file)
+        self.assertIsNone(target_path)
+        self.assertFalse(os.path.exists(self.source_file))
+
+    def test_different_content_gets_suffix(self):
+        """A same-name file with different content should get a numeric suffix."""
+        with open(os.path.join(self.target_dir, "photo.jpg"), "w") as f:
+            f.write("Completely different content")
+
+        target_path = get_unique_filename(self.target_dir, "photo.jpg", self.source_file)
+        self.assertEqual(target_path, os.path.join(self.target_dir, "photo_1.jpg"))
+        self.assertTrue(os.path.exists(self.source_file))
+
+    def test_collision_landed_after_cache_primed(self):
+        """A file landed by another worker after the listing was cached must still be seen."""
+        sortphotos._dir_listing(self.target_dir)  # Prime the cache on the empty directory
+        with open(os.path.join(self.target_dir, "photo.jpg"), "w") as f:
+            f.write("Completely different content")
+
+        target_path = get_unique_filename(self.target_dir, "photo.jpg", self.source_file)
+        self.assertEqual(target_path, os.path.join(self.target_dir, "photo_1.jpg"))
+
+    def test_same_size_different_content_gets_suffix(self):
+        """Equal sizes alone are not enough: content must match to be a duplicate."""
+        with open(os.path.join(self.target_dir, "photo.jpg"), "w") as f:
+            f.write("Other  content")  # Same length as "Source content"
+
+        target_path = get_unique_filename(self.target_dir, "photo.jpg", self.source_file)
+        self.assertEqual(target_path, os.path.join(self.target_dir, "photo_1.jpg"))
+
+if __name__ == "__main__":
+    unittest.main()